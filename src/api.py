@@ -3,10 +3,16 @@ FastAPI Service for Heart Disease Prediction
 Exposes /predict endpoint with logging and monitoring
 """
 
+import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+from contextlib import asynccontextmanager
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
 from typing import List
 
@@ -30,9 +36,14 @@ except ImportError:
         "ignore", message=".*Field.*has conflict with protected namespace.*"
     )
 
-# Now import mlflow and other packages (warnings are already suppressed)
-import mlflow.sklearn
+# One BLAS thread per request thread, so the /predict threadpool does not
+# oversubscribe cores (must be set before numpy is imported)
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+# Now import other packages (warnings are already suppressed)
+import joblib
 import numpy as np
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import Response
 from prometheus_client import (
@@ -43,28 +54,85 @@ from prometheus_client import (
     generate_latest,
 )
 from pydantic import BaseModel, ConfigDict, Field
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
+
+from data_preprocessing import (
+    FEATURE_ORDER,
+    HeartDiseasePreprocessor,
+    confidence_level,
+    confidence_levels,
+)
 
-from data_preprocessing import HeartDiseasePreprocessor
-
-# Configure logging
+# Configure logging. Records are queued to a listener thread that owns the
+# file and stream handlers, so request handlers never block on log I/O. The
+# queue handler only merges message args; the listener adds the prefix.
+log_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+log_handlers = [logging.FileHandler("api.log"), logging.StreamHandler()]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("api.log"), logging.StreamHandler()],
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(log_queue)],
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app):
+    """Size the threadpool that runs batched model calls on startup"""
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv("PREDICT_THREADS", "8"))
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Heart Disease Prediction API",
     description="MLOps Assignment - Heart Disease Prediction Service",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Global variables for model and preprocessor
 model = None
 preprocessor = None
 
+# Fused inference kernel, rebuilt whenever model or preprocessor is swapped
+_fast_predict = None
+_fast_predict_key = None
+
+# Micro-batching of concurrent /predict requests
+MAX_BATCH = int(os.getenv("MAX_BATCH", "32"))
+MAX_WAIT_MS = float(os.getenv("MAX_WAIT_MS", "5"))
+
+# Largest list accepted by /predict_batch (scored in a single model call)
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "256"))
+
+# Gathers a request's feature values, in training column order, in one call
+get_features = attrgetter(*FEATURE_ORDER)
+
+# Categorical features (column index, number of levels) as bounded by the
+# input schema; the rest of the 13 columns are continuous
+CATEGORICAL_LEVELS = (
+    (1, 2),  # sex
+    (2, 4),  # cp
+    (5, 2),  # fbs
+    (6, 3),  # restecg
+    (8, 2),  # exang
+    (10, 3),  # slope
+    (11, 5),  # ca
+    (12, 4),  # thal
+)
+CONTINUOUS_FEATURES = (0, 3, 4, 7, 9)
+
 # Prometheus metrics
 REQUEST_COUNT = Counter(
     "http_requests_total", "Total HTTP requests", ["method", "endpoint", "status"]
@@ -77,6 +145,21 @@ PREDICTION_DURATION = Histogram(
     "Time spent processing predictions",
     buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
 )
+MODEL_INFERENCE_DURATION = Histogram(
+    "model_inference_duration_seconds",
+    "Time spent in the model kernel per batch (excludes validation and queueing)",
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],
+)
+BATCH_PREDICTION_DURATION = Histogram(
+    "batch_prediction_duration_seconds",
+    "Time spent processing /predict_batch requests",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+PREDICTION_BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Number of rows scored per model call",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+)
 
 
 class HeartDiseaseInput(BaseModel):
@@ -100,7 +183,9 @@ class HeartDiseaseInput(BaseModel):
     )
     thal: int = Field(..., ge=0, le=3, description="Thalassemia")
 
+    # Unknown fields are rejected (422) rather than silently dropped
     model_config = ConfigDict(
+        extra="forbid",
         json_schema_extra={
             "example": {
                 "age": 63,
@@ -117,9 +202,13 @@ class HeartDiseaseInput(BaseModel):
                 "ca": 0,
                 "thal": 1,
             }
-        }
+        },
     )
 
+    def ordered_values(self):
+        """Feature values in training column order"""
+        return get_features(self)
+
 
 class PredictionResponse(BaseModel):
     """Response schema for prediction"""
@@ -132,64 +221,106 @@ class PredictionResponse(BaseModel):
     timestamp: str = Field(..., description="Prediction timestamp")
 
 
+def build_fast_predict(model, preprocessor):
+    """
+    Build a scoring function mapping raw feature rows to P(disease)
+
+    Logistic regression is reduced to one float32 affine map with the scaler
+    folded into the coefficients, skipping sklearn's per-call validation.
+    The categorical part of that map is precomputed for every combination of
+    levels, so scoring is a table gather plus a 5-term dot product. Other
+    models get a single predict_proba call instead of predict +
+    predict_proba.
+    """
+    scaled = preprocessor is not None and preprocessor.is_fitted
+
+    if isinstance(model, LogisticRegression) and model.coef_.shape[0] == 1:
+        weights = model.coef_[0].astype(np.float64)
+        bias = float(model.intercept_[0])
+        if scaled:
+            weights = weights * preprocessor.inv_scale_
+            bias -= float(weights @ preprocessor.mean_)
+        cat_index = [index for index, _ in CATEGORICAL_LEVELS]
+        levels = [n_levels for _, n_levels in CATEGORICAL_LEVELS]
+        cont_index = list(CONTINUOUS_FEATURES)
+
+        # cat_table[sex, cp, ..., thal] = sum of weight * level, flattened
+        cat_table = np.zeros(levels)
+        for axis, (index, n_levels) in enumerate(CATEGORICAL_LEVELS):
+            shape = [1] * len(levels)
+            shape[axis] = n_levels
+            cat_table += (weights[index] * np.arange(n_levels)).reshape(shape)
+        cat_table = (cat_table.ravel() + bias).astype(np.float32)
+        strides = np.array(
+            [int(np.prod(levels[axis + 1 :])) for axis in range(len(levels))],
+            dtype=np.intp,
+        )
+        cont_weights = weights[cont_index].astype(np.float32)
+
+        def fast_predict(features):
+            # Categoricals are validated integers within their schema bounds
+            offsets = features[:, cat_index].astype(np.intp) @ strides
+            return expit(features[:, cont_index] @ cont_weights + cat_table[offsets])
+
+        return fast_predict
+
+    def fast_predict(features):
+        if scaled:
+            features = preprocessor.transform(features)
+        return model.predict_proba(features)[:, 1]
+
+    return fast_predict
+
+
+def get_fast_predict():
+    """Return the inference kernel for the currently loaded model"""
+    global _fast_predict, _fast_predict_key
+
+    if (
+        _fast_predict is None
+        or _fast_predict_key[0] is not model
+        or _fast_predict_key[1] is not preprocessor
+    ):
+        _fast_predict = build_fast_predict(model, preprocessor)
+        _fast_predict_key = (model, preprocessor)
+    return _fast_predict
+
+
+def load_mlflow_model():
+    """Fallback: load the MLflow model recorded by the last training run"""
+    # Training writes the run's model directory here, so no run search or
+    # directory walk over mlruns/ is needed
+    pointer_path = "artifacts/latest_model_path.txt"
+    if os.getenv("ENABLE_MLFLOW", "1") != "1" or not os.path.isfile(pointer_path):
+        return None
+
+    import mlflow.sklearn
+
+    model_path = Path(pointer_path).read_text().strip()
+    loaded = mlflow.sklearn.load_model(f"file://{os.path.abspath(model_path)}")
+    logger.info(f"Model loaded from {model_path}")
+    return loaded
+
+
 def load_model():
-    """Load MLflow model and preprocessor"""
+    """Load model and preprocessor"""
     global model, preprocessor
 
     try:
-        # Try to load from MLflow
-        model_path = None
-
-        # Find latest model
-        if os.path.exists("mlruns"):
-            try:
-                import mlflow
-                from mlflow.tracking import MlflowClient
-
-                client = MlflowClient()
-                experiments = client.search_experiments()
-                if experiments:
-                    latest_run = client.search_runs(
-                        experiment_ids=[experiments[0].experiment_id],
-                        max_results=1,
-                        order_by=["start_time DESC"],
-                    )
-                    if latest_run:
-                        run_id = latest_run[0].info.run_id
-                        model_path = f"mlruns/{experiments[0].experiment_id}/{run_id}/artifacts/model"
-            except Exception as e:
-                logger.warning(f"Could not use MLflow client: {e}")
-
-        if model_path and os.path.exists(model_path):
-            model = mlflow.sklearn.load_model(f"file://{os.path.abspath(model_path)}")
+        # Prefer the plain joblib artifact written at train time; it avoids
+        # importing the MLflow runtime just to unpickle an sklearn estimator
+        model_path = os.getenv("MODEL_PATH", "artifacts/model.joblib")
+        if os.path.isfile(model_path):
+            model = joblib.load(model_path, mmap_mode="r")
             logger.info(f"Model loaded from {model_path}")
         else:
-            # Fallback: try to find any model
-            import glob
-
-            model_dirs = []
-            for root, dirs, files in os.walk("mlruns"):
-                if "model" in dirs:
-                    model_dirs.append(os.path.join(root, "model"))
-
-            if model_dirs:
-                # Try to load from MLflow format
-                for mf in model_dirs:
-                    try:
-                        model = mlflow.sklearn.load_model(
-                            f"file://{os.path.abspath(mf)}"
-                        )
-                        logger.info(f"Model loaded from {mf}")
-                        break
-                    except Exception as e:
-                        logger.debug(f"Failed to load from {mf}: {e}")
-                        continue
+            model = load_mlflow_model()
 
         if model is None:
             logger.warning("No model found. API will not be able to serve predictions.")
 
         # Load preprocessor
-        preprocessor_path = os.getenv("PREPROCESSOR_PATH", "artifacts/preprocessor.pkl")
+        preprocessor_path = os.getenv("PREPROCESSOR_PATH", "artifacts/preprocessor.npz")
         if os.path.exists(preprocessor_path):
             preprocessor = HeartDiseasePreprocessor.load(preprocessor_path)
             logger.info(f"Preprocessor loaded from {preprocessor_path}")
@@ -197,14 +328,93 @@ def load_model():
             logger.warning("Preprocessor not found, will use default")
             preprocessor = HeartDiseasePreprocessor()
 
+        if model is not None:
+            # Build the kernel and run it once so the first request does not
+            # pay for lazy initialisation
+            get_fast_predict()(np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32))
+
     except Exception as e:
         logger.error(f"Error loading model: {e}", exc_info=True)
         # Don't raise - allow API to start but mark model as unavailable
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Load model on startup"""
+def score_batch(features):
+    """Run the inference kernel on a batch, recording model-only latency"""
+    PREDICTION_BATCH_SIZE.observe(len(features))
+    with MODEL_INFERENCE_DURATION.time():
+        return get_fast_predict()(features)
+
+
+class BatchQueue:
+    """
+    Coalesce concurrent single-row predictions into one kernel call
+
+    Requests enqueue their feature values and await a future. A background
+    task drains up to max_batch rows, waiting at most max_wait_ms for
+    stragglers, writes them into a preallocated float32 buffer, scores them
+    together in the threadpool and resolves each future.
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        # Only the worker touches the buffer, one batch at a time
+        self._buffer = np.empty((max_batch, len(FEATURE_ORDER)), dtype=np.float32)
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, features):
+        """Queue one row of feature values (FEATURE_ORDER) and wait for its probability"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Start (or restart, e.g. under TestClient) on the running loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                features = self._buffer[: len(batch)]
+                for i, (row, _) in enumerate(batch):
+                    features[i] = row
+                probabilities = await to_thread.run_sync(score_batch, features)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+
+
+batch_queue = BatchQueue()
+
+
+# Load model at import time so each worker is ready before its first request
+if os.environ.get("SKIP_MODEL_LOAD") != "1":
     logger.info("Starting Heart Disease Prediction API...")
     load_model()
     logger.info("API ready to serve predictions")
@@ -237,7 +447,8 @@ async def predict(input_data: HeartDiseaseInput):
     """
     Predict heart disease risk
 
-    Returns prediction (0 or 1) and confidence probability
+    Returns prediction (0 or 1) and confidence probability. Concurrent
+    requests are scored together by the batch queue.
     """
     import time
 
@@ -247,50 +458,22 @@ async def predict(input_data: HeartDiseaseInput):
         REQUEST_COUNT.labels(
             method="POST", endpoint="/predict", status="processing"
         ).inc()
-        # Log request
-        logger.info(f"Prediction request received: {input_data.model_dump()}")
-
-        # Convert input to array
-        features = np.array(
-            [
-                [
-                    input_data.age,
-                    input_data.sex,
-                    input_data.cp,
-                    input_data.trestbps,
-                    input_data.chol,
-                    input_data.fbs,
-                    input_data.restecg,
-                    input_data.thalach,
-                    input_data.exang,
-                    input_data.oldpeak,
-                    input_data.slope,
-                    input_data.ca,
-                    input_data.thal,
-                ]
-            ]
-        )
+        # Log request (serialising the payload is only paid for at DEBUG level)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Prediction request received: %s", input_data.model_dump())
 
-        # Preprocess
-        if preprocessor and preprocessor.is_fitted:
-            features_processed = preprocessor.transform(features)
-        else:
-            features_processed = features
+        # Feature values in training column order
+        features = get_features(input_data)
 
-        # Predict
+        # Predict (preprocessing is fused into the inference kernel)
         if model is None:
             raise HTTPException(status_code=503, detail="Model not loaded")
 
-        prediction = model.predict(features_processed)[0]
-        probability = model.predict_proba(features_processed)[0][1]
+        probability = await batch_queue.submit(features)
+        prediction = int(probability > 0.5)
 
         # Determine confidence level
-        if probability >= 0.8:
-            confidence = "High"
-        elif probability >= 0.6:
-            confidence = "Medium"
-        else:
-            confidence = "Low"
+        confidence = confidence_level(probability)
 
         response = PredictionResponse(
             prediction=int(prediction),
@@ -300,7 +483,10 @@ async def predict(input_data: HeartDiseaseInput):
         )
 
         logger.info(
-            f"Prediction: {prediction}, Probability: {probability:.4f}, Confidence: {confidence}"
+            "Prediction: %s, Probability: %.4f, Confidence: %s",
+            prediction,
+            probability,
+            confidence,
         )
 
         # Record metrics
@@ -311,12 +497,94 @@ async def predict(input_data: HeartDiseaseInput):
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Prediction error: {e}", exc_info=True)
+        logger.error("Prediction error: %s", e, exc_info=True)
         REQUEST_COUNT.labels(method="POST", endpoint="/predict", status="500").inc()
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@app.post("/predict_batch", response_model=List[PredictionResponse])
+async def predict_batch(inputs: List[HeartDiseaseInput]):
+    """
+    Predict heart disease risk for several patients at once
+
+    All rows are stacked into one float32 matrix and scored with a single
+    call to the inference kernel.
+    """
+    import time
+
+    start_time = time.time()
+
+    # Checked here rather than with conlist: the pinned FastAPI release does not
+    # enforce conlist length bounds on request bodies
+    if not 1 <= len(inputs) <= MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch must contain between 1 and {MAX_BATCH_ROWS} rows",
+        )
+
+    try:
+        REQUEST_COUNT.labels(
+            method="POST", endpoint="/predict_batch", status="processing"
+        ).inc()
+
+        if model is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+
+        # Stack feature values in training column order
+        n_features = len(FEATURE_ORDER)
+        features = np.fromiter(
+            (value for item in inputs for value in item.ordered_values()),
+            dtype=np.float32,
+            count=len(inputs) * n_features,
+        ).reshape(-1, n_features)
+
+        # One kernel call for the whole batch, off the event loop
+        probabilities = await to_thread.run_sync(score_batch, features)
+        predictions = (probabilities > 0.5).astype(np.int8)
+        confidences = confidence_levels(probabilities)
+
+        timestamp = datetime.now().isoformat()
+        responses = [
+            PredictionResponse(
+                prediction=int(prediction),
+                probability=float(probability),
+                confidence=str(confidence),
+                timestamp=timestamp,
+            )
+            for prediction, probability, confidence in zip(
+                predictions, probabilities, confidences
+            )
+        ]
+
+        logger.info("Batch prediction: %d rows", len(responses))
+
+        # Record metrics
+        duration = time.time() - start_time
+        BATCH_PREDICTION_DURATION.observe(duration)
+        n_positive = int(np.count_nonzero(predictions))
+        PREDICTION_COUNT.labels(prediction="1").inc(n_positive)
+        PREDICTION_COUNT.labels(prediction="0").inc(len(responses) - n_positive)
+        REQUEST_COUNT.labels(
+            method="POST", endpoint="/predict_batch", status="200"
+        ).inc()
+
+        return responses
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Batch prediction error: %s", e, exc_info=True)
+        REQUEST_COUNT.labels(
+            method="POST", endpoint="/predict_batch", status="500"
+        ).inc()
+        raise HTTPException(
+            status_code=500, detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
 @app.get("/metrics")
 async def metrics():
     """Prometheus-compatible metrics endpoint"""
@@ -327,4 +595,15 @@ async def metrics():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Serve this module's app object directly: an "api:app" import string
+    # would import the module a second time and register the Prometheus
+    # metrics twice. For several workers run the uvicorn CLI instead
+    # (uvicorn api:app --workers N), as the Docker image does.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="auto",
+        http="auto",
+        access_log=False,
+    )
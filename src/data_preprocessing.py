@@ -3,30 +3,76 @@ Data Preprocessing Pipeline
 Handles missing values, encoding, and feature scaling
 """
 
-import pickle
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler
+
+# Feature columns in the order the preprocessor and models expect them
+FEATURE_ORDER = (
+    "age",
+    "sex",
+    "cp",
+    "trestbps",
+    "chol",
+    "fbs",
+    "restecg",
+    "thalach",
+    "exang",
+    "oldpeak",
+    "slope",
+    "ca",
+    "thal",
+)
+
+# Confidence bands: [0, 0.6) Low, [0.6, 0.8) Medium, [0.8, 1] High
+_CONF_EDGES = np.array([0.6, 0.8])
+_CONF_LABELS = ("Low", "Medium", "High")
+_CONF_LABELS_ARR = np.array(_CONF_LABELS)
+
+
+def confidence_level(probability):
+    """Map a probability of heart disease to its confidence label"""
+    return _CONF_LABELS[int(np.searchsorted(_CONF_EDGES, probability, side="right"))]
+
+
+def confidence_levels(probabilities):
+    """Vectorized confidence_level for an array of probabilities"""
+    return np.take(
+        _CONF_LABELS_ARR, np.searchsorted(_CONF_EDGES, probabilities, side="right")
+    )
 
 
 class HeartDiseasePreprocessor:
-    """Preprocessing pipeline for Heart Disease dataset"""
+    """
+    Preprocessing pipeline for Heart Disease dataset
+
+    Median imputation followed by standard scaling, computed with NumPy.
+    After fit() the per-feature float32 vectors are available as:
+
+    - statistics_: medians used to fill missing values
+    - mean_: feature means after imputation
+    - inv_scale_: reciprocal of the standard deviations (1 for constant columns)
+    """
 
     def __init__(self):
-        self.scaler = StandardScaler()
-        self.imputer = SimpleImputer(strategy="median")
+        self.statistics_ = None
+        self.mean_ = None
+        self.inv_scale_ = None
         self.is_fitted = False
 
     def fit(self, X):
         """Fit the preprocessor on training data"""
-        # Handle missing values
-        X_imputed = self.imputer.fit_transform(X)
+        X = np.array(X, dtype=np.float32)
 
-        # Scale features
-        self.scaler.fit(X_imputed)
+        # Handle missing values (per-column median)
+        self.statistics_ = np.nanmedian(X, axis=0)
+        np.copyto(X, self.statistics_, where=np.isnan(X))
+
+        # Scale features (population std, constant columns left unscaled)
+        self.mean_ = X.mean(axis=0, dtype=np.float64).astype(np.float32)
+        std = X.std(axis=0, dtype=np.float64)
+        std[std < 10 * np.finfo(std.dtype).eps] = 1.0
+        self.inv_scale_ = (1.0 / std).astype(np.float32)
 
         self.is_fitted = True
         return self
@@ -36,40 +82,44 @@ class HeartDiseasePreprocessor:
         if not self.is_fitted:
             raise ValueError("Preprocessor must be fitted before transform")
 
-        # Impute missing values
-        X_imputed = self.imputer.transform(X)
-
-        # Scale features
-        X_scaled = self.scaler.transform(X_imputed)
+        # Impute and scale in one pass over a float32 copy
+        X = np.array(X, dtype=np.float32)
+        np.copyto(X, self.statistics_, where=np.isnan(X))
+        X -= self.mean_
+        X *= self.inv_scale_
 
-        return X_scaled
+        return X
 
     def fit_transform(self, X):
         """Fit and transform in one step"""
         return self.fit(X).transform(X)
 
     def save(self, filepath):
-        """Save preprocessor to disk"""
-        with open(filepath, "wb") as f:
-            pickle.dump(
-                {
-                    "scaler": self.scaler,
-                    "imputer": self.imputer,
-                    "is_fitted": self.is_fitted,
-                },
-                f,
+        """Save preprocessor to disk as plain NumPy arrays (no pickle)"""
+        arrays = {"is_fitted": np.array(self.is_fitted)}
+        if self.is_fitted:
+            # Stored as the float32 vectors transform() uses, so load() hands
+            # them straight to the inference kernels without conversion
+            arrays.update(
+                statistics=self.statistics_.astype(np.float32, copy=False),
+                mean=self.mean_.astype(np.float32, copy=False),
+                inv_scale=self.inv_scale_.astype(np.float32, copy=False),
             )
 
+        # Write through a file handle so np.savez keeps the given filename
+        with open(filepath, "wb") as f:
+            np.savez(f, **arrays)
+
     @classmethod
     def load(cls, filepath):
         """Load preprocessor from disk"""
-        with open(filepath, "rb") as f:
-            data = pickle.load(f)
-
         preprocessor = cls()
-        preprocessor.scaler = data["scaler"]
-        preprocessor.imputer = data["imputer"]
-        preprocessor.is_fitted = data["is_fitted"]
+        with np.load(filepath, allow_pickle=False) as data:
+            preprocessor.is_fitted = bool(data["is_fitted"])
+            if preprocessor.is_fitted:
+                preprocessor.statistics_ = data["statistics"]
+                preprocessor.mean_ = data["mean"]
+                preprocessor.inv_scale_ = data["inv_scale"]
 
         return preprocessor
 
@@ -83,14 +133,17 @@ def load_and_preprocess_data(
     Returns:
         X_train, X_test, y_train, y_test, preprocessor
     """
+    # Imported here so the API, which only needs the preprocessor, never
+    # pays for pandas
+    import pandas as pd
     from sklearn.model_selection import train_test_split
 
-    # Load data
-    df = pd.read_csv(data_path)
+    # Load data (all columns are numeric; float32 matches the preprocessor)
+    df = pd.read_csv(data_path, dtype=np.float32)
 
     # Separate features and target
     X = df.drop("target", axis=1)
-    y = df["target"]
+    y = df["target"].astype(np.int8)
 
     # Check if we can use stratified split (need at least 2 samples per class)
     # in each split
@@ -4,12 +4,20 @@ Downloads the Heart Disease UCI dataset from UCI Machine Learning Repository
 """
 
 import os
-import urllib.request
 from pathlib import Path
 
+import httpx
+import numpy as np
 import pandas as pd
 
 
+def fetch_to_file(client, url, output_path):
+    """Download url to output_path using an open httpx client"""
+    response = client.get(url)
+    response.raise_for_status()
+    Path(output_path).write_bytes(response.content)
+
+
 def download_heart_disease_dataset(data_dir="data"):
     """
     Download Heart Disease UCI dataset from UCI ML Repository
@@ -43,50 +51,55 @@ def download_heart_disease_dataset(data_dir="data"):
     print(f"Downloading Heart Disease dataset from UCI...")
     print(f"URL: {url}")
 
-    try:
-        # Download the file
-        urllib.request.urlretrieve(url, output_path)
-        print(f"Downloaded to: {output_path}")
-
-        # Read and clean the data
-        df = pd.read_csv(output_path, names=column_names, na_values="?")
-
-        # Convert target to binary (0 = no disease, 1 = disease)
-        # Original dataset has 0-4, we'll convert >0 to 1
-        df["target"] = (df["target"] > 0).astype(int)
-
-        # Save cleaned version
-        df.to_csv(output_path, index=False)
-        print(f"Dataset saved with {len(df)} rows and {len(df.columns)} columns")
-        print(f"Target distribution:\n{df['target'].value_counts()}")
+    # One client serves both attempts: pooled connections and gzip
+    # content-encoding (httpx sends Accept-Encoding: gzip by default)
+    with httpx.Client(timeout=30, follow_redirects=True) as client:
+        try:
+            # Download the file
+            fetch_to_file(client, url, output_path)
+            print(f"Downloaded to: {output_path}")
 
-        return output_path
+            # Read and clean the data (explicit dtype skips type inference)
+            df = pd.read_csv(
+                output_path, names=column_names, na_values="?", dtype=np.float32
+            )
 
-    except Exception as e:
-        print(f"Error downloading dataset: {e}")
-        print("Trying alternative: using Kaggle dataset URL...")
+            # Convert target to binary (0 = no disease, 1 = disease)
+            # Original dataset has 0-4, we'll convert >0 to 1
+            df["target"] = (df["target"] > 0).astype(np.int8)
 
-        # Alternative: Try direct download from a mirror
-        try:
-            # Using a more reliable source
-            alt_url = (
-                "https://raw.githubusercontent.com/plotly/datasets/master/heart.csv"
-            )
-            urllib.request.urlretrieve(alt_url, output_path)
-            df = pd.read_csv(output_path)
-            if "target" not in df.columns:
-                # Rename if needed
-                if "target" in df.columns or "condition" in df.columns:
-                    pass
-                else:
-                    # Assume last column is target
-                    df.columns = list(df.columns[:-1]) + ["target"]
+            # Save cleaned version
             df.to_csv(output_path, index=False)
-            print(f"Downloaded alternative dataset with {len(df)} rows")
+            print(f"Dataset saved with {len(df)} rows and {len(df.columns)} columns")
+            print(f"Target distribution:\n{df['target'].value_counts()}")
+
             return output_path
-        except Exception as e2:
-            print(f"Alternative download also failed: {e2}")
-            raise
+
+        except Exception as e:
+            print(f"Error downloading dataset: {e}")
+            print("Trying alternative: using Kaggle dataset URL...")
+
+            # Alternative: Try direct download from a mirror
+            try:
+                # Using a more reliable source
+                alt_url = (
+                    "https://raw.githubusercontent.com/plotly/datasets/master/heart.csv"
+                )
+                fetch_to_file(client, alt_url, output_path)
+                df = pd.read_csv(output_path)
+                if "target" not in df.columns:
+                    # Rename if needed
+                    if "target" in df.columns or "condition" in df.columns:
+                        pass
+                    else:
+                        # Assume last column is target
+                        df.columns = list(df.columns[:-1]) + ["target"]
+                df.to_csv(output_path, index=False)
+                print(f"Downloaded alternative dataset with {len(df)} rows")
+                return output_path
+            except Exception as e2:
+                print(f"Alternative download also failed: {e2}")
+                raise
 
 
 if __name__ == "__main__":
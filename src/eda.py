@@ -10,6 +10,11 @@ import sys
 import warnings
 from pathlib import Path
 
+import matplotlib
+
+# Headless backend: no GUI toolkit probing (must precede the pyplot import)
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -26,6 +31,8 @@ def setup_plotting():
     sns.set_style("whitegrid")
     plt.rcParams["figure.figsize"] = (12, 8)
     plt.rcParams["figure.dpi"] = 100
+    # Lay out every figure at save time instead of calling tight_layout per plot
+    plt.rcParams["figure.autolayout"] = True
 
 
 def load_data(data_path):
@@ -73,10 +80,9 @@ def plot_class_distribution(df, output_dir):
     plt.xlabel("Heart Disease Status", fontsize=12)
     for i, v in enumerate(target_counts.values):
         plt.text(i, v + 5, str(v), ha="center", fontsize=12)
-    plt.tight_layout()
 
     output_path = os.path.join(output_dir, "class_distribution.png")
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
+    plt.savefig(output_path, dpi=150)
     print(f"\nSaved class distribution plot to: {output_path}")
     plt.close()
 
@@ -90,32 +96,30 @@ def plot_feature_histograms(df, output_dir):
     fig, axes = plt.subplots(2, 3, figsize=(18, 10))
     axes = axes.ravel()
 
-    for idx, col in enumerate(numerical_cols):
-        axes[idx].hist(
-            df[col], bins=30, color="steelblue", edgecolor="black", alpha=0.7
-        )
-        axes[idx].set_title(
-            f"{col.capitalize()} Distribution", fontsize=12, fontweight="bold"
-        )
-        axes[idx].set_xlabel(col.capitalize())
-        axes[idx].set_ylabel("Frequency")
-        axes[idx].grid(True, alpha=0.3)
+    # One pandas call draws all histograms; the loop only sets labels
+    df[numerical_cols].hist(
+        bins=30, ax=axes[:5], color="steelblue", edgecolor="black", alpha=0.7
+    )
+    for ax, col in zip(axes, numerical_cols):
+        ax.set_title(f"{col.capitalize()} Distribution", fontsize=12, fontweight="bold")
+        ax.set_xlabel(col.capitalize())
+        ax.set_ylabel("Frequency")
+        ax.grid(True, alpha=0.3)
 
     # Remove empty subplot
     fig.delaxes(axes[5])
-    plt.tight_layout()
 
     output_path = os.path.join(output_dir, "feature_histograms.png")
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
+    plt.savefig(output_path, dpi=150)
     print(f"Saved feature histograms to: {output_path}")
     plt.close()
 
 
-def plot_correlation_heatmap(df, output_dir):
-    """Plot correlation heatmap"""
+def plot_correlation_heatmap(correlation_matrix, output_dir):
+    """Plot a precomputed correlation matrix as a heatmap"""
     plt.figure(figsize=(14, 12))
-    correlation_matrix = df.corr()
-    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
+    # Hide the diagonal and upper triangle (transposed view of one tri array)
+    mask = np.tri(len(correlation_matrix), dtype=bool).T
     sns.heatmap(
         correlation_matrix,
         mask=mask,
@@ -128,7 +132,6 @@ def plot_correlation_heatmap(df, output_dir):
         cbar_kws={"shrink": 0.8},
     )
     plt.title("Feature Correlation Heatmap", fontsize=16, fontweight="bold", pad=20)
-    plt.tight_layout()
 
     output_path = os.path.join(output_dir, "correlation_heatmap.png")
     plt.savefig(output_path, dpi=300, bbox_inches="tight")
@@ -136,7 +139,7 @@ def plot_correlation_heatmap(df, output_dir):
     plt.close()
 
     # Top correlations with target
-    target_corr = df.corr()["target"].sort_values(ascending=False)
+    target_corr = correlation_matrix["target"].sort_values(ascending=False)
     print("\nTop correlations with target:")
     print(target_corr)
 
@@ -147,25 +150,25 @@ def plot_boxplots_by_target(df, output_dir):
     fig, axes = plt.subplots(2, 3, figsize=(18, 10))
     axes = axes.ravel()
 
-    for idx, col in enumerate(numerical_cols):
-        df.boxplot(column=col, by="target", ax=axes[idx])
-        axes[idx].set_title(
+    # One grouped boxplot call covers all columns; the loop only sets labels
+    df.boxplot(column=numerical_cols, by="target", ax=axes[:5])
+    for ax, col in zip(axes, numerical_cols):
+        ax.set_title(
             f"{col.capitalize()} by Heart Disease", fontsize=12, fontweight="bold"
         )
-        axes[idx].set_xlabel("Heart Disease (0=No, 1=Yes)")
-        axes[idx].set_ylabel(col.capitalize())
-        plt.suptitle("")
+        ax.set_xlabel("Heart Disease (0=No, 1=Yes)")
+        ax.set_ylabel(col.capitalize())
+    plt.suptitle("")
 
     fig.delaxes(axes[5])
-    plt.tight_layout()
 
     output_path = os.path.join(output_dir, "boxplots_by_target.png")
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
+    plt.savefig(output_path, dpi=150)
     print(f"Saved boxplots to: {output_path}")
     plt.close()
 
 
-def print_summary(df):
+def print_summary(df, correlation_matrix):
     """Print EDA summary"""
     print("\n" + "=" * 50)
     print("EDA Summary")
@@ -179,7 +182,7 @@ def print_summary(df):
         f"2. Class distribution is relatively balanced (ratio: {target_counts[0] / target_counts[1]:.2f})"
     )
 
-    target_corr = df.corr()["target"].abs().sort_values(ascending=False)
+    target_corr = correlation_matrix["target"].abs().sort_values(ascending=False)
     top_features = target_corr[1:4].index.tolist()  # Exclude target itself
     print(f"3. Top features correlated with target: {', '.join(top_features)}")
 
@@ -227,16 +230,17 @@ def main():
     print("\n4. Plotting feature distributions...")
     plot_feature_histograms(df, output_dir)
 
-    # Correlation heatmap
+    # Correlation heatmap (matrix is reused by the summary)
     print("\n5. Analyzing feature correlations...")
-    plot_correlation_heatmap(df, output_dir)
+    correlation_matrix = df.corr()
+    plot_correlation_heatmap(correlation_matrix, output_dir)
 
     # Box plots
     print("\n6. Plotting boxplots by target variable...")
     plot_boxplots_by_target(df, output_dir)
 
     # Summary
-    print_summary(df)
+    print_summary(df, correlation_matrix)
 
     print("\n" + "=" * 60)
     print("EDA completed successfully!")
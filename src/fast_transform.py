@@ -0,0 +1,43 @@
+"""
+Single-row preprocessing kernel
+Imputes and standardizes one feature row into a caller-owned buffer
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _standardize_numpy(x, fill, mean, inv_scale, out):
+    """NumPy fallback: same arithmetic using in-place ufuncs"""
+    np.copyto(out, x)
+    np.copyto(out, fill, where=np.isnan(x))
+    np.subtract(out, mean, out=out)
+    np.multiply(out, inv_scale, out=out)
+    return out
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def standardize(x, fill, mean, inv_scale, out):
+        """Impute NaNs with fill, then write (x - mean) * inv_scale to out"""
+        for i in range(x.shape[0]):
+            value = x[i]
+            if np.isnan(value):
+                value = fill[i]
+            out[i] = (value - mean[i]) * inv_scale[i]
+        return out
+
+else:
+    standardize = _standardize_numpy
+
+
+def transform_row(preprocessor, x, out):
+    """Apply a fitted HeartDiseasePreprocessor to one row, writing into out"""
+    return standardize(
+        x, preprocessor.statistics_, preprocessor.mean_, preprocessor.inv_scale_, out
+    )
@@ -5,6 +5,8 @@ Useful for testing predictions without starting the API server
 
 import os
 import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
 
 # Add src to path FIRST (before importing local modules)
@@ -27,21 +29,70 @@ except ImportError:
         "ignore", message=".*Field.*has conflict with protected namespace.*"
     )
 
-# Now import mlflow and other packages (warnings are already suppressed)
-import mlflow.sklearn
+# Now import other packages (warnings are already suppressed)
+import joblib
 import numpy as np
 
-from data_preprocessing import HeartDiseasePreprocessor
+from data_preprocessing import (
+    FEATURE_ORDER,
+    HeartDiseasePreprocessor,
+    confidence_level,
+    confidence_levels,
+)
+from fast_transform import transform_row
+
+# MLflow is only used as a model source when tracking is enabled
+ENABLE_MLFLOW = os.environ.get("ENABLE_MLFLOW", "1") == "1"
+
+
+def _read_through(path):
+    """Read a file and discard it, leaving its pages in the OS cache"""
+    with open(path, "rb") as f:
+        while f.read(1 << 20):
+            pass
+
+
+def prefetch_artifacts(*paths):
+    """Start reading artifact files into the page cache in parallel"""
+    threads = []
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        if hasattr(os, "posix_fadvise"):
+            # Asynchronous readahead hint; the kernel fetches in the background
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        else:
+            thread = threading.Thread(target=_read_through, args=(path,))
+            thread.start()
+            threads.append(thread)
+
+    for thread in threads:
+        thread.join()
 
 
 def load_model_and_preprocessor():
     """Load model and preprocessor"""
-    # Try to find latest MLflow model
     model = None
     preprocessor = None
 
-    if os.path.exists("mlruns"):
+    joblib_path = "artifacts/model.joblib"
+    preprocessor_path = "artifacts/preprocessor.npz"
+    prefetch_artifacts(joblib_path, preprocessor_path)
+
+    # Prefer the uncompressed joblib artifact from training; its arrays are
+    # memory-mapped instead of copied
+    if os.path.isfile(joblib_path):
+        model = joblib.load(joblib_path, mmap_mode="r")
+        print(f"Loaded model from {joblib_path}")
+
+    # Otherwise fall back to the latest MLflow model
+    elif ENABLE_MLFLOW and os.path.exists("mlruns"):
         try:
+            import mlflow.sklearn
             from mlflow.tracking import MlflowClient
 
             client = MlflowClient()
@@ -64,7 +115,6 @@ def load_model_and_preprocessor():
             print(f"Error loading MLflow model: {e}")
 
     # Load preprocessor
-    preprocessor_path = "artifacts/preprocessor.pkl"
     if os.path.exists(preprocessor_path):
         preprocessor = HeartDiseasePreprocessor.load(preprocessor_path)
         print(f"Loaded preprocessor from {preprocessor_path}")
@@ -74,25 +124,70 @@ def load_model_and_preprocessor():
     return model, preprocessor
 
 
-def predict(model, preprocessor, features):
-    """Make prediction"""
-    # Convert to numpy array
-    features_array = np.array([features])
-
-    # Preprocess
-    if preprocessor and preprocessor.is_fitted:
+def predict(model, preprocessor, features_2d):
+    """
+    Make predictions for a batch of feature rows
+
+    Args:
+        model: Fitted classifier
+        preprocessor: Fitted HeartDiseasePreprocessor, or None
+        features_2d: Array-like of shape (n_samples, 13)
+
+    Returns:
+        Tuple of (int8 labels, float probabilities of heart disease)
+    """
+    features_array = np.ascontiguousarray(features_2d, dtype=np.float32)
+    assert features_array.ndim == 2, "features_2d must have shape (n_samples, 13)"
+
+    # Preprocess (single rows go through the compiled kernel, skipping
+    # NumPy's per-operation dispatch; the output row is per call so
+    # concurrent callers never share it)
+    if preprocessor and preprocessor.is_fitted and features_array.shape[0] == 1:
+        features_processed = np.empty_like(features_array)
+        transform_row(preprocessor, features_array[0], features_processed[0])
+    elif preprocessor and preprocessor.is_fitted:
         features_processed = preprocessor.transform(features_array)
     else:
         features_processed = features_array
 
-    # Predict
-    prediction = model.predict(features_processed)[0]
-    probability = model.predict_proba(features_processed)[0][1]
+    # One predict_proba call; labels follow from the positive-class column
+    probabilities = model.predict_proba(features_processed)[:, 1]
+    predictions = (probabilities > 0.5).astype(np.int8)
 
-    return int(prediction), float(probability)
+    return predictions, probabilities
 
 
-if __name__ == "__main__":
+def predict_one(model, preprocessor, features):
+    """Make a prediction for a single row"""
+    features_array = np.asarray(features, dtype=np.float32).reshape(1, -1)
+    predictions, probabilities = predict(model, preprocessor, features_array)
+    return int(predictions[0]), float(probabilities[0])
+
+
+def make_predict_one(model, preprocessor, maxsize=1024):
+    """
+    Build a cached predict_one for one model/preprocessor pair
+
+    Repeated rows are served from a cache keyed on the row bytes. The cache
+    belongs to the returned function, so it is freed with it; build a new
+    one after loading or refitting a model.
+    """
+
+    @lru_cache(maxsize=maxsize)
+    def predict_cached(feature_bytes):
+        features_array = np.frombuffer(feature_bytes, dtype=np.float32)
+        return predict_one(model, preprocessor, features_array)
+
+    def cached_predict_one(features):
+        return predict_cached(np.asarray(features, dtype=np.float32).tobytes())
+
+    cached_predict_one.cache_info = predict_cached.cache_info
+    cached_predict_one.cache_clear = predict_cached.cache_clear
+    return cached_predict_one
+
+
+def main():
+    """Run a prediction for a sample input"""
     # Example input
     sample_input = {
         "age": 63,
@@ -118,31 +213,23 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # Extract features in correct order
-    feature_order = [
-        "age",
-        "sex",
-        "cp",
-        "trestbps",
-        "chol",
-        "fbs",
-        "restecg",
-        "thalach",
-        "exang",
-        "oldpeak",
-        "slope",
-        "ca",
-        "thal",
-    ]
-    features = [sample_input[key] for key in feature_order]
+    features = np.empty((1, len(FEATURE_ORDER)), dtype=np.float32)
+    features[0] = np.fromiter(
+        (sample_input[key] for key in FEATURE_ORDER),
+        dtype=np.float32,
+        count=len(FEATURE_ORDER),
+    )
 
     print(f"\nMaking prediction for sample input:")
     for key, value in sample_input.items():
         print(f"  {key}: {value}")
 
-    prediction, probability = predict(model, preprocessor, features)
+    prediction, probability = predict_one(model, preprocessor, features[0])
 
     print(f"\nPrediction: {'Heart Disease' if prediction == 1 else 'No Heart Disease'}")
     print(f"Probability: {probability:.4f}")
-    print(
-        f"Confidence: {'High' if probability >= 0.8 else 'Medium' if probability >= 0.6 else 'Low'}"
-    )
+    print(f"Confidence: {confidence_level(probability)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,74 @@ Import this module early in your scripts to suppress common warnings
 from MLflow and Pydantic dependencies.
 """
 
+import re
+import sys
 import warnings
 
-# Suppress urllib3 OpenSSL warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="urllib3")
-warnings.filterwarnings("ignore", message=".*NotOpenSSLWarning.*")
-
-# Suppress Pydantic deprecation warnings from MLflow
-warnings.filterwarnings("ignore", message=".*PydanticDeprecatedSince20.*")
-warnings.filterwarnings("ignore", message=".*Pydantic V1 style.*")
-warnings.filterwarnings("ignore", message=".*Support for class-based `config`.*")
-warnings.filterwarnings("ignore", message=".*Valid config keys have changed.*")
-warnings.filterwarnings(
-    "ignore", message=".*Field.*has conflict with protected namespace.*"
+# Nothing to export; `from warnings_config import *` only applies the filters
+__all__ = []
+
+# (message, category, module) patterns, in the order they were historically
+# registered with warnings.filterwarnings
+_IGNORED = (
+    # Suppress urllib3 OpenSSL warnings
+    ("", UserWarning, "urllib3"),
+    (".*NotOpenSSLWarning.*", Warning, ""),
+    # Suppress Pydantic deprecation warnings from MLflow
+    (".*PydanticDeprecatedSince20.*", Warning, ""),
+    (".*Pydantic V1 style.*", Warning, ""),
+    (".*Support for class-based `config`.*", Warning, ""),
+    (".*Valid config keys have changed.*", Warning, ""),
+    (".*Field.*has conflict with protected namespace.*", Warning, ""),
+    # Suppress Pydantic validator deprecation warnings
+    (".*@validator.*is deprecated.*", Warning, ""),
+    (".*@root_validator.*is deprecated.*", Warning, ""),
+    (".*migrate to Pydantic V2.*", Warning, ""),
+)
+
+# Precompiled warnings.filters entries, compiled the way filterwarnings()
+# does it. Each filterwarnings() call inserts at the front, so the last
+# pattern registered takes precedence: reverse to keep that order.
+_FILTERS = tuple(
+    (
+        "ignore",
+        re.compile(message, re.I) if message else None,
+        category,
+        re.compile(module) if module else None,
+        0,
+    )
+    for message, category, module in reversed(_IGNORED)
 )
 
-# Suppress Pydantic validator deprecation warnings
-warnings.filterwarnings("ignore", message=".*@validator.*is deprecated.*")
-warnings.filterwarnings("ignore", message=".*@root_validator.*is deprecated.*")
-warnings.filterwarnings("ignore", message=".*migrate to Pydantic V2.*")
+
+def _apply_filters():
+    """Prepend the ignore filters to warnings.filters in one step"""
+    # Explicit -W options win
+    if sys.warnoptions:
+        return
+
+    # Check the live filter list rather than a flag, so a re-import (e.g. as
+    # src.warnings_config) after resetwarnings() puts the filters back
+    missing = [
+        (entry, pattern)
+        for entry, pattern in zip(_FILTERS, reversed(_IGNORED))
+        if entry not in warnings.filters
+    ]
+    if not missing:
+        return
+
+    # Invalidate the per-module "already warned" caches, as filterwarnings does
+    filters_mutated = getattr(warnings, "_filters_mutated", None)
+    if filters_mutated is None:
+        # Private hook unavailable: register through the public API instead
+        for _, (message, category, module) in reversed(missing):
+            warnings.filterwarnings(
+                "ignore", message=message, category=category, module=module
+            )
+        return
+
+    warnings.filters[:0] = [entry for entry, _ in missing]
+    filters_mutated()
+
+
+_apply_filters()
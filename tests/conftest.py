@@ -0,0 +1,60 @@
+"""
+Shared pytest fixtures
+"""
+
+import os
+import sys
+import warnings
+
+# Tests never track experiments; keep MLflow out of the import chain
+os.environ["ENABLE_MLFLOW"] = "0"
+
+import joblib
+import numpy as np
+import pytest
+import sklearn
+
+# Add src and the fixtures directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "fixtures"))
+
+from generate_fixtures import MOCK_MODEL_PATH, build_mock_model
+
+
+def _load_mock_model():
+    """Load the pickled fixture, or None if it is missing or from another sklearn"""
+    if not MOCK_MODEL_PATH.exists():
+        return None
+    try:
+        # The version check below handles a mismatch; skip sklearn's warning
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = joblib.load(MOCK_MODEL_PATH, mmap_mode="r")
+        if getattr(model, "_sklearn_version", None) != sklearn.__version__:
+            return None
+        model.predict_proba(np.zeros((1, 13), dtype=np.float64))
+    except Exception:
+        return None
+    return model
+
+
+@pytest.fixture(scope="session")
+def mock_model():
+    """Pre-fitted LogisticRegression loaded from tests/fixtures (make fixtures)"""
+    model = _load_mock_model()
+    if model is None:
+        # Pickles do not carry across scikit-learn versions; refit instead
+        model = build_mock_model()
+
+    # Pay first-call warm-up costs here rather than inside the first test
+    model.predict_proba(np.zeros((1, 13), dtype=np.float64))
+    return model
+
+
+@pytest.fixture(scope="session")
+def transform_row():
+    """fast_transform.transform_row, with its kernel compiled (or loaded from cache)"""
+    import fast_transform
+
+    fast_transform.standardize(*(np.zeros(13, dtype=np.float32) for _ in range(5)))
+    return fast_transform.transform_row
@@ -0,0 +1,31 @@
+"""
+Generate test fixtures
+Writes a small fitted LogisticRegression used as the API's mock model
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+FIXTURES_DIR = Path(__file__).parent
+MOCK_MODEL_PATH = FIXTURES_DIR / "mock_lr.joblib"
+
+
+def build_mock_model():
+    """Fit a minimal logistic regression on random 13-feature data"""
+    rng = np.random.default_rng(42)
+    model = LogisticRegression(max_iter=1000, random_state=42)
+    model.fit(rng.standard_normal((10, 13)), np.tile([0, 1], 5))
+    return model
+
+
+def main():
+    """Write the mock model fixture (uncompressed so it can be memory-mapped)"""
+    joblib.dump(build_mock_model(), MOCK_MODEL_PATH, compress=0)
+    print(f"Wrote {MOCK_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
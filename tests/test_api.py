@@ -8,26 +8,26 @@ import sys
 import numpy as np
 import pytest
 from fastapi.testclient import TestClient
-from sklearn.linear_model import LogisticRegression
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-# Create a simple mock model before importing api
-mock_model = LogisticRegression(max_iter=1000, random_state=42)
-mock_model.fit(np.random.randn(10, 13), np.random.randint(0, 2, 10))
+# The mock_model fixture replaces whatever load_model() would find on disk
+os.environ["SKIP_MODEL_LOAD"] = "1"
 
-# Import and mock the model
 from src import api as api_module
-
-api_module.model = mock_model
-api_module.preprocessor = None
-
 from src.api import app
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def inject_mock_model(mock_model):
+    """Serve predictions from the pre-fitted mock model"""
+    api_module.model = mock_model
+    api_module.preprocessor = None
+
+
 def test_root_endpoint():
     """Test root endpoint"""
     response = client.get("/")
@@ -96,6 +96,159 @@ def test_predict_endpoint_invalid_input():
     response = client.post("/predict", json=invalid_data)
     assert response.status_code == 422  # Validation error
 
+    # Unknown fields are rejected rather than ignored
+    extra_field = dict(invalid_data, age=63, target=1)
+    response = client.post("/predict", json=extra_field)
+    assert response.status_code == 422
+
+
+def test_predict_batch_endpoint(mock_model):
+    """Test batch predict endpoint scores every row in order"""
+    rows = [
+        {
+            "age": 63,
+            "sex": 1,
+            "cp": 3,
+            "trestbps": 145,
+            "chol": 233,
+            "fbs": 1,
+            "restecg": 0,
+            "thalach": 150,
+            "exang": 0,
+            "oldpeak": 2.3,
+            "slope": 0,
+            "ca": 0,
+            "thal": 1,
+        },
+        {
+            "age": 41,
+            "sex": 0,
+            "cp": 1,
+            "trestbps": 130,
+            "chol": 204,
+            "fbs": 0,
+            "restecg": 2,
+            "thalach": 172,
+            "exang": 1,
+            "oldpeak": 1.4,
+            "slope": 2,
+            "ca": 3,
+            "thal": 2,
+        },
+    ]
+
+    response = client.post("/predict_batch", json=rows)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == len(rows)
+
+    features = np.array(
+        [[row[key] for key in api_module.FEATURE_ORDER] for row in rows],
+        dtype=np.float32,
+    )
+    expected = mock_model.predict_proba(features)[:, 1]
+    for item, probability in zip(data, expected):
+        assert item["prediction"] == int(probability > 0.5)
+        assert item["probability"] == pytest.approx(probability, abs=1e-5)
+        assert item["confidence"] in ["Low", "Medium", "High"]
+
+
+def test_predict_batch_endpoint_size_limits():
+    """Test batch predict endpoint rejects empty and oversized lists"""
+    row = {
+        "age": 63,
+        "sex": 1,
+        "cp": 3,
+        "trestbps": 145,
+        "chol": 233,
+        "fbs": 1,
+        "restecg": 0,
+        "thalach": 150,
+        "exang": 0,
+        "oldpeak": 2.3,
+        "slope": 0,
+        "ca": 0,
+        "thal": 1,
+    }
+
+    assert client.post("/predict_batch", json=[]).status_code == 422
+    oversized = [row] * (api_module.MAX_BATCH_ROWS + 1)
+    assert client.post("/predict_batch", json=oversized).status_code == 422
+
+
+def test_predict_endpoints_without_model(monkeypatch):
+    """Test predict endpoints return 503 rather than 500 with no model loaded"""
+    monkeypatch.setattr(api_module, "model", None)
+    row = {
+        "age": 63,
+        "sex": 1,
+        "cp": 3,
+        "trestbps": 145,
+        "chol": 233,
+        "fbs": 1,
+        "restecg": 0,
+        "thalach": 150,
+        "exang": 0,
+        "oldpeak": 2.3,
+        "slope": 0,
+        "ca": 0,
+        "thal": 1,
+    }
+
+    response = client.post("/predict", json=row)
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Model not loaded"
+
+    response = client.post("/predict_batch", json=[row])
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Model not loaded"
+
+
+def test_fast_predict_matches_sklearn():
+    """Test the fused kernels match sklearn on preprocessed features"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    from data_preprocessing import HeartDiseasePreprocessor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(100, 20, (60, 13)).astype(np.float32)
+    # Categorical columns take integer levels, as the input schema enforces
+    for index, n_levels in api_module.CATEGORICAL_LEVELS:
+        X[:, index] = rng.integers(0, n_levels, len(X))
+    y = np.tile([0, 1], 30)
+
+    preprocessor = HeartDiseasePreprocessor()
+    X_processed = preprocessor.fit_transform(X)
+
+    for model in (
+        LogisticRegression(max_iter=1000, random_state=42),
+        RandomForestClassifier(n_estimators=10, random_state=42),
+    ):
+        model.fit(X_processed, y)
+        fast_predict = api_module.build_fast_predict(model, preprocessor)
+        expected = model.predict_proba(X_processed)[:, 1]
+        assert np.allclose(fast_predict(X), expected, atol=1e-5)
+
+
+def test_batch_queue_concurrent_requests(mock_model):
+    """Test concurrent submissions are scored together and in order"""
+    import asyncio
+
+    rows = np.random.rand(5, 13).astype(np.float32)
+    # Categorical columns take integer levels, as the input schema enforces
+    for index, n_levels in api_module.CATEGORICAL_LEVELS:
+        rows[:, index] = np.random.randint(0, n_levels, len(rows))
+    queue = api_module.BatchQueue(max_batch=4, max_wait_ms=5)
+
+    async def submit_all():
+        return await asyncio.gather(*(queue.submit(row) for row in rows))
+
+    probabilities = asyncio.run(submit_all())
+
+    expected = mock_model.predict_proba(rows)[:, 1]
+    assert np.allclose(probabilities, expected, atol=1e-5)
+
 
 def test_metrics_endpoint():
     """Test metrics endpoint returns Prometheus-formatted metrics"""
@@ -108,3 +261,41 @@ def test_metrics_endpoint():
     text = response.text
     # Check for Prometheus metric format
     assert "# HELP" in text or "# TYPE" in text or "http_requests_total" in text
+
+
+def test_api_script_entry_point(tmp_path):
+    """Test `python src/api.py` starts and serves the health endpoint"""
+    import socket
+    import subprocess
+    import time
+
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    script = os.path.join(os.path.dirname(__file__), "..", "src", "api.py")
+    env = dict(os.environ, SKIP_MODEL_LOAD="1", PORT=str(port))
+    process = subprocess.Popen(
+        [sys.executable, script],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            assert process.poll() is None, process.stderr.read().decode()
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/health")
+                break
+            except httpx.TransportError:
+                assert time.time() < deadline, "API did not start in time"
+                time.sleep(0.2)
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
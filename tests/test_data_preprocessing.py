@@ -19,8 +19,9 @@ def test_preprocessor_initialization():
     """Test preprocessor initialization"""
     preprocessor = HeartDiseasePreprocessor()
     assert preprocessor.is_fitted == False
-    assert preprocessor.scaler is not None
-    assert preprocessor.imputer is not None
+    assert preprocessor.statistics_ is None
+    assert preprocessor.mean_ is None
+    assert preprocessor.inv_scale_ is None
 
 
 def test_preprocessor_fit_transform():
@@ -51,6 +52,23 @@ def test_preprocessor_missing_values():
     assert X_transformed.shape == X.shape
 
 
+def test_preprocessor_matches_sklearn():
+    """Test preprocessor matches SimpleImputer + StandardScaler"""
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.random.randn(50, 13) * 10 + 100
+    X[::7, 3] = np.nan
+    X[:, 5] = 1.0  # constant column
+
+    expected = StandardScaler().fit_transform(
+        SimpleImputer(strategy="median").fit_transform(X)
+    )
+    X_transformed = HeartDiseasePreprocessor().fit_transform(X)
+
+    assert np.allclose(X_transformed, expected, atol=1e-4)
+
+
 def test_preprocessor_save_load(tmp_path):
     """Test preprocessor save and load"""
     preprocessor = HeartDiseasePreprocessor()
@@ -58,15 +76,18 @@ def test_preprocessor_save_load(tmp_path):
     preprocessor.fit_transform(X)
 
     # Save
-    filepath = tmp_path / "preprocessor.pkl"
+    filepath = tmp_path / "preprocessor.npz"
     preprocessor.save(str(filepath))
 
     # Load
     loaded_preprocessor = HeartDiseasePreprocessor.load(str(filepath))
 
     assert loaded_preprocessor.is_fitted == True
-    assert loaded_preprocessor.scaler is not None
-    assert loaded_preprocessor.imputer is not None
+    for name in ("statistics_", "mean_", "inv_scale_"):
+        assert np.array_equal(
+            getattr(loaded_preprocessor, name), getattr(preprocessor, name)
+        )
+    assert np.allclose(loaded_preprocessor.transform(X), preprocessor.transform(X))
 
 
 def test_load_and_preprocess_data(tmp_path):
@@ -105,3 +126,24 @@ def test_load_and_preprocess_data(tmp_path):
     assert len(y_train) == X_train.shape[0]
     assert len(y_test) == X_test.shape[0]
     assert preprocessor.is_fitted == True
+    assert X_train.dtype == np.float32
+    assert X_test.dtype == np.float32
+
+
+def test_fast_transform_matches_transform(transform_row):
+    """Test the single-row kernel matches the batch transform"""
+    from fast_transform import _standardize_numpy
+
+    X = np.random.randn(50, 13).astype(np.float32)
+    X[0, 3] = np.nan
+    preprocessor = HeartDiseasePreprocessor()
+    preprocessor.fit(X)
+
+    expected = preprocessor.transform(X[:1])[0]
+    out = np.empty(13, dtype=np.float32)
+    assert np.allclose(transform_row(preprocessor, X[0], out), expected, atol=1e-6)
+
+    fallback = _standardize_numpy(
+        X[0], preprocessor.statistics_, preprocessor.mean_, preprocessor.inv_scale_, out
+    )
+    assert np.allclose(fallback, expected, atol=1e-6)
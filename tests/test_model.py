@@ -11,7 +11,7 @@ import pytest
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, roc_auc_score
 
@@ -70,6 +70,29 @@ def test_random_forest():
     assert 0 <= accuracy <= 1
 
 
+def test_hist_gradient_boosting():
+    """Test Histogram Gradient Boosting model"""
+    # Create sample data
+    X_train = np.random.randn(100, 13).astype(np.float32)
+    y_train = np.random.randint(0, 2, 100)
+    X_test = np.random.randn(20, 13).astype(np.float32)
+
+    # Train model
+    model = HistGradientBoostingClassifier(
+        max_iter=20, max_depth=8, early_stopping=True, random_state=42
+    )
+    model.fit(X_train, y_train)
+
+    # Predict
+    y_pred = model.predict(X_test)
+    y_proba = model.predict_proba(X_test)[:, 1]
+
+    # Check predictions
+    assert len(y_pred) == len(X_test)
+    assert all(pred in [0, 1] for pred in y_pred)
+    assert all(0 <= prob <= 1 for prob in y_proba)
+
+
 def test_model_predict_proba():
     """Test that models return probability predictions"""
     X = np.random.randn(10, 13)
@@ -88,3 +111,122 @@ def test_model_predict_proba():
     assert rf_proba.shape == (10, 2)
     assert np.allclose(lr_proba.sum(axis=1), 1.0)
     assert np.allclose(rf_proba.sum(axis=1), 1.0)
+
+
+def test_predict_batch_and_single_row():
+    """Test batch predictions agree with sklearn and the single-row wrapper"""
+    from predict import predict, predict_one
+
+    X = np.random.randn(10, 13).astype(np.float32)
+    y = np.tile([0, 1], 5)
+    model = LogisticRegression(max_iter=1000, random_state=42)
+    model.fit(X, y)
+
+    predictions, probabilities = predict(model, None, X)
+
+    assert predictions.shape == (10,)
+    assert np.array_equal(predictions, model.predict(X))
+    assert np.allclose(probabilities, model.predict_proba(X)[:, 1])
+
+    prediction, probability = predict_one(model, None, X[0])
+    assert prediction == predictions[0]
+    assert probability == pytest.approx(probabilities[0])
+
+
+def test_make_predict_one_cache_is_per_model():
+    """Test cached single-row predictors do not share results across models"""
+    from predict import make_predict_one
+
+    X = np.random.randn(10, 13).astype(np.float32)
+    y = np.tile([0, 1], 5)
+    first = LogisticRegression(max_iter=1000).fit(X, y)
+    second = LogisticRegression(max_iter=1000).fit(X, 1 - y)
+
+    predict_first = make_predict_one(first, None)
+    predict_second = make_predict_one(second, None)
+
+    assert predict_first(X[0]) == predict_first(X[0])
+    assert predict_first.cache_info().hits == 1
+    assert predict_second(X[0])[1] == pytest.approx(second.predict_proba(X[:1])[0, 1])
+    assert predict_second.cache_info().hits == 0
+
+
+def test_confidence_levels():
+    """Test confidence bands, including their boundaries"""
+    from predict import confidence_level, confidence_levels
+
+    probabilities = np.array([0.0, 0.59, 0.6, 0.79, 0.8, 1.0])
+    expected = ["Low", "Low", "Medium", "Medium", "High", "High"]
+
+    assert [confidence_level(p) for p in probabilities] == expected
+    assert confidence_levels(probabilities).tolist() == expected
+
+
+def test_mlflow_helpers_forward_when_enabled(monkeypatch):
+    """Test the MLflow helpers call MLflow when ENABLE_MLFLOW=1"""
+    import importlib
+    from unittest import mock
+
+    mlflow_stub = mock.MagicMock()
+    monkeypatch.setenv("ENABLE_MLFLOW", "1")
+    monkeypatch.setitem(sys.modules, "mlflow", mlflow_stub)
+    monkeypatch.setitem(sys.modules, "mlflow.sklearn", mlflow_stub.sklearn)
+    sys.modules.pop("train_model", None)
+
+    try:
+        train_model = importlib.import_module("train_model")
+        model = object()
+
+        assert train_model.start_run("run") is mlflow_stub.start_run.return_value
+        train_model.log_params({"C": 1.0})
+        train_model.log_metrics({"test_roc_auc": 0.5})
+        train_model.log_artifact("artifacts/file.png")
+        train_model.log_model(model)
+    finally:
+        sys.modules.pop("train_model", None)
+
+    mlflow_stub.start_run.assert_called_once_with(run_name="run")
+    mlflow_stub.log_params.assert_called_once_with({"C": 1.0})
+    mlflow_stub.log_metrics.assert_called_once_with({"test_roc_auc": 0.5})
+    mlflow_stub.log_artifact.assert_called_once_with("artifacts/file.png")
+    mlflow_stub.sklearn.log_model.assert_called_once_with(model, "model")
+
+
+def test_predict_single_rows_concurrently():
+    """Test single-row predictions with a preprocessor are thread-safe"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from data_preprocessing import HeartDiseasePreprocessor
+    from predict import predict
+
+    X = np.random.randn(200, 13).astype(np.float32)
+    y = np.random.randint(0, 2, 200)
+    preprocessor = HeartDiseasePreprocessor()
+    model = LogisticRegression(max_iter=1000, random_state=42)
+    model.fit(preprocessor.fit_transform(X), y)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda row: predict(model, preprocessor, row[None, :]), X)
+        )
+
+    probabilities = np.concatenate([probability for _, probability in results])
+    expected = model.predict_proba(preprocessor.transform(X))[:, 1]
+    assert np.allclose(probabilities, expected, atol=1e-6)
+
+
+def test_warning_filters_reapplied_after_reset():
+    """Test the ignore filters come back after resetwarnings()"""
+    import warnings
+
+    import warnings_config
+
+    with warnings.catch_warnings():
+        warnings.resetwarnings()
+        warnings_config._apply_filters()
+        applied = list(warnings.filters)
+        assert all(entry in applied for entry in warnings_config._FILTERS)
+
+        # Applying again must not duplicate entries
+        warnings_config._apply_filters()
+        assert warnings.filters == applied